@@ -0,0 +1,181 @@
+import asyncio
+import time
+from collections import deque
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Hashable, List
+
+# The Gemini SDK is imported on first use to keep module import cheap
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+MAX_CONCURRENCY = 8       # upper bound on concurrent Gemini calls across the process
+MIN_CONCURRENCY = 1
+MAX_RETRIES = 5
+BASE_BACKOFF = 15.0       # seconds every caller pauses after the first quota error
+MAX_BACKOFF = 60.0        # Gemini quotas reset per minute, so retries span 15+30+60+60s
+
+
+class AdaptiveLimiter:
+    """
+    Async concurrency limit shared by every Gemini call (AIMD)
+    - ResourceExhausted halves the limit and pauses all callers, with exponential backoff
+    - After `limit` successes in a row the limit grows by one, up to max_limit
+    - Other errors free their slot without changing the limit or backoff
+    """
+
+    SUCCESS = "success"
+    THROTTLED = "throttled"
+    ERROR = "error"
+
+    def __init__(self, max_limit: int = MAX_CONCURRENCY, min_limit: int = MIN_CONCURRENCY):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = max_limit
+        self.in_flight = 0
+        self.successes = 0
+        self.backoff = BASE_BACKOFF
+        self.paused_until = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        # A slot is only taken once no pause is in effect, so cancelling a waiting caller can't leak it
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self, outcome: str = SUCCESS):
+        self.in_flight -= 1
+        now = time.monotonic()
+
+        if outcome == self.THROTTLED:
+            self.successes = 0
+            # Requests that were already in flight when the pause started don't back off again
+            if now >= self.paused_until:
+                self.limit = max(self.min_limit, self.limit // 2)
+                self.paused_until = now + self.backoff
+                self.backoff = min(MAX_BACKOFF, self.backoff * 2)
+        elif outcome == self.SUCCESS:
+            # Successes from calls already in flight when a pause started don't reset the backoff
+            if now >= self.paused_until:
+                self.backoff = BASE_BACKOFF
+            self.successes += 1
+            if self.successes >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1)
+                self.successes = 0
+
+        # Wake every waiter, each re-checks the pause and the limit
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _release_when_done(self, future: asyncio.Future):
+        from google.api_core.exceptions import ResourceExhausted
+
+        if future.cancelled():
+            outcome = self.ERROR
+        elif isinstance(future.exception(), ResourceExhausted):
+            outcome = self.THROTTLED
+        elif future.exception() is not None:
+            outcome = self.ERROR
+        else:
+            outcome = self.SUCCESS
+        self.release(outcome)
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking SDK call in a worker thread under the limit, retrying on ResourceExhausted
+        The slot is freed when the worker thread finishes, so a cancelled caller's
+        request still counts against the limit while it is in flight.
+        """
+
+        from google.api_core.exceptions import ResourceExhausted
+
+        for attempt in range(MAX_RETRIES):
+            await self.acquire()
+            future = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+            # Registered before shield's own callback, so the limiter is updated before we retry
+            future.add_done_callback(self._release_when_done)
+            try:
+                return await asyncio.shield(future)
+            except ResourceExhausted:
+                pass
+
+            print(f"retry {attempt + 1}/{MAX_RETRIES} (concurrency limit {self.limit})")
+
+        raise RuntimeError(f"failed after {MAX_RETRIES} retries")
+
+
+class SingleFlight:
+    """
+    Merge concurrent calls with the same key into one in-flight call
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shield so one caller disconnecting doesn't cancel the call for the others
+        return await asyncio.shield(future)
+
+
+limiter = AdaptiveLimiter()
+flights = SingleFlight()
+
+
+@lru_cache(maxsize=None)
+def get_model(model_name: str) -> "genai.GenerativeModel":
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(model_name)
+
+
+async def embed_content(model: str, text: str, task_type: str) -> List[float]:
+    import google.generativeai as genai
+
+    async def run():
+        result = await limiter.call(
+            genai.embed_content,
+            model=model,
+            content=text,
+            task_type=task_type,
+        )
+        return result["embedding"]
+
+    return await flights.do(("embed", model, task_type, text), run)
+
+
+async def generate_content(model_name: str, prompt: str, generation_config: Any) -> str:
+    """
+    Requests are merged on (model_name, prompt), generation_config is assumed fixed per model
+    """
+
+    async def run():
+        response = await limiter.call(
+            get_model(model_name).generate_content,
+            prompt,
+            generation_config=generation_config,
+        )
+        return response.text.strip()
+
+    return await flights.do(("generate", model_name, prompt), run)
@@ -1,8 +1,14 @@
 import os
 from typing import List, Dict
-import google.generativeai as genai
+
+from app.client import generate_content
 
 GENERATION_MODEL = "gemini-2.5-flash-lite"
+# A plain dict is accepted as a GenerationConfig, so the SDK isn't needed at import time
+GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "max_output_tokens": 2048,
+}
 
 
 def build_prompt(question: str, chunks: List[Dict], repo: str = "") -> str:
@@ -49,17 +55,7 @@ def build_prompt(question: str, chunks: List[Dict], repo: str = "") -> str:
     return prompt
 
 
-def generate_answer(question: str, chunks: List[Dict], repo: str = "") -> str:
+async def generate_answer(question: str, chunks: List[Dict], repo: str = "") -> str:
 
     prompt = build_prompt(question, chunks, repo)
-    model = genai.GenerativeModel(GENERATION_MODEL)
-
-    response = model.generate_content(
-        prompt,
-        generation_config=genai.types.GenerationConfig(
-            temperature=0.1,
-            max_output_tokens=2048,
-        ),
-    )
-
-    return response.text.strip()
+    return await generate_content(GENERATION_MODEL, prompt, GENERATION_CONFIG)
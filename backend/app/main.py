@@ -1,4 +1,9 @@
+import os
 import shutil
+import time
+
+# Fallback clock for platforms without /proc
+IMPORT_START = time.perf_counter()
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,12 +11,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.models import (
     IndexRequest, IndexResponse,
     QueryRequest, QueryResponse,
-    RetrievedChunk,
+    RetrievedChunk, StatsResponse,
 )
 from app.ingest import clone_repo, ingest_repo
 from app.embeddings import configure_gemini, embed_chunks, embed_query
 from app.retrieval import (
-    build_index, save_index, load_index, search,
+    build_index, save_index, load_index, search, prewarm_index,
     index_exists, get_index_size, get_repo_info,
 )
 from app.generator import generate_answer
@@ -31,6 +36,26 @@ app.add_middleware(
 )
 
 CLONE_DIR = "data/repo"
+PREWARM_INDEX = os.getenv("PREWARM_INDEX", "").lower() in ("1", "true", "yes")
+
+first_query_served = False
+
+
+def seconds_since_process_start() -> float:
+    """
+    Seconds since this process started, from /proc, so interpreter and uvicorn startup are included.
+    Falls back to time since main.py was imported where /proc is unavailable.
+    """
+
+    try:
+        with open("/proc/self/stat") as f:
+            # starttime is field 22, counted after the ")" that ends the command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - IMPORT_START
 
 
 @app.on_event("startup")
@@ -38,6 +63,31 @@ async def startup():
     configure_gemini()
     print("Gemini configured")
 
+    if PREWARM_INDEX:
+        start = time.perf_counter()
+        num_vectors = prewarm_index()
+        print(f"Prewarmed index: {num_vectors} vectors in {time.perf_counter() - start:.2f}s")
+
+
+@app.get("/stats", response_model=StatsResponse)
+async def stats():
+    """
+    Counts for the current index, read from repo_info.json without loading FAISS
+    """
+
+    repo_info = get_repo_info()
+    if not index_exists() or not repo_info:
+        return StatsResponse(indexed=False)
+
+    return StatsResponse(
+        indexed=True,
+        repo=repo_info.get("repo_url"),
+        num_files=repo_info.get("num_files", 0),
+        num_chunks=repo_info.get("num_chunks", 0),
+        languages=repo_info.get("languages", []),
+    )
+
+
 @app.post("/index", response_model=IndexResponse)
 async def index_repo(request: IndexRequest):
     """
@@ -78,7 +128,7 @@ async def index_repo(request: IndexRequest):
     # Embed
     print("Embedding chunks...")
     texts = [c["content"] for c in chunks]
-    embeddings = embed_chunks(texts)
+    embeddings = await embed_chunks(texts)
 
     # Index
     print("Building FAISS index...")
@@ -109,7 +159,7 @@ async def index_repo(request: IndexRequest):
 async def query(request: QueryRequest):
     """
       1. Embed query
-      2. FAISS top-k search
+      2. FAISS search, over-fetch candidates and re-rank with MMR
       3. Build prompt
       4. Generate answer with gemini
       5. Return answer + source chunks + scores
@@ -123,9 +173,14 @@ async def query(request: QueryRequest):
     if not request.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty.")
 
-    query_embedding = embed_query(request.question)
+    query_embedding = await embed_query(request.question)
     index, metadata = load_index()
-    raw_results = search(index, metadata, query_embedding, top_k=request.top_k)
+    raw_results = search(
+        index, metadata, query_embedding,
+        top_k=request.top_k,
+        mmr_lambda=request.mmr_lambda,
+        candidate_multiplier=request.candidate_multiplier,
+    )
 
     if not raw_results:
         raise HTTPException(status_code=500, detail="No results from index.")
@@ -133,12 +188,17 @@ async def query(request: QueryRequest):
     repo_info = get_repo_info()
     repo_url = repo_info.get("repo_url", "") if repo_info else ""
 
-    answer = generate_answer(request.question, raw_results, repo=repo_url)
+    answer = await generate_answer(request.question, raw_results, repo=repo_url)
     chunks = []
     for r in raw_results:
         chunk = RetrievedChunk(**r)
         chunks.append(chunk)
 
+    global first_query_served
+    if not first_query_served:
+        first_query_served = True
+        print(f"First query served {seconds_since_process_start():.2f}s after process start")
+
     return QueryResponse(
         question=request.question,
         answer=answer,
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 
@@ -28,7 +28,9 @@ class RetrievedChunk(BaseModel):
 
 class QueryRequest(BaseModel):
     question: str
-    top_k: Optional[int] = 6
+    top_k: int = Field(6, ge=1, le=50)
+    mmr_lambda: float = Field(0.7, ge=0.0, le=1.0)     # 1.0 = pure relevance, 0.0 = pure diversity
+    candidate_multiplier: int = Field(4, ge=1, le=10)  # 1 = plain top-k, no re-ranking
 
 
 class QueryResponse(BaseModel):
@@ -37,3 +39,11 @@ class QueryResponse(BaseModel):
     retrieved_chunks: List[RetrievedChunk]
     num_chunks_retrieved: int
     repo: Optional[str] = None
+
+
+class StatsResponse(BaseModel):
+    indexed: bool
+    repo: Optional[str] = None
+    num_files: int = 0
+    num_chunks: int = 0
+    languages: List[str] = []
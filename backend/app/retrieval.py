@@ -1,18 +1,33 @@
 import json
 import os
-import numpy as np
-import faiss
-from typing import List, Dict, Tuple, Optional
+import time
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional
+
+# faiss and numpy are imported lazily so the API can start (and serve /stats) without loading them
+if TYPE_CHECKING:
+    import faiss
+    import numpy as np
 
 INDEX_PATH = "vectorstore/faiss.index"
 METADATA_PATH = "vectorstore/metadata.json"
 REPO_INFO_PATH = "vectorstore/repo_info.json"
 
-def build_index(embeddings: np.ndarray) -> faiss.Index:
+MMR_LAMBDA = 0.7              # 1.0 = pure relevance, 0.0 = pure diversity
+CANDIDATE_MULTIPLIER = 4      # over-fetch top_k * multiplier candidates before re-ranking
+MAX_CHUNKS_PER_FILE = 2       # cap on chunks from the same file in the final set
+MAX_CANDIDATES = 500          # upper bound on candidates re-ranked per query
+LOAD_ATTEMPTS = 3             # reloads of a mismatched index/metadata pair before giving up
+
+# Loaded index and metadata, reused across queries until either file changes
+_cache: Dict = {}
+
+def build_index(embeddings: "np.ndarray") -> "faiss.Index":
     """
     Build FAISS IndexFlatIP index with L2-normalized vectors for cosine similarity search
     """
 
+    import faiss
+
     dim = embeddings.shape[1]
     faiss.normalize_L2(embeddings)
     index = faiss.IndexFlatIP(dim)
@@ -20,23 +35,75 @@ def build_index(embeddings: np.ndarray) -> faiss.Index:
     return index
 
 
-def save_index(index: faiss.Index, metadata: List[Dict], repo_info: Dict):
+def save_index(index: "faiss.Index", metadata: List[Dict], repo_info: Dict):
+    import faiss
+
     os.makedirs("vectorstore", exist_ok=True)
-    faiss.write_index(index, INDEX_PATH)
-    with open(METADATA_PATH, "w") as f:
-        json.dump(metadata, f, indent=2)
-    with open(REPO_INFO_PATH, "w") as f:
-        json.dump(repo_info, f, indent=2)
+    # Every file is written to a temp path and swapped in, so no file is ever partially written.
+    # Between the swaps a reader can still pair the old index with new metadata, which load_index detects
+    for path, data in ((METADATA_PATH, metadata), (REPO_INFO_PATH, repo_info)):
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(path + ".tmp", path)
+    faiss.write_index(index, INDEX_PATH + ".tmp")
+    os.replace(INDEX_PATH + ".tmp", INDEX_PATH)
+
+    _cache.clear()
+    _cache.update(key=_cache_key(), index=index, metadata=metadata)
     print(f"Saved index: {index.ntotal} vectors.")
 
 
-def load_index() -> Tuple[faiss.Index, List[Dict]]:
+def _cache_key() -> Tuple[float, float]:
+    return os.path.getmtime(INDEX_PATH), os.path.getmtime(METADATA_PATH)
+
+
+def load_index() -> Tuple["faiss.Index", List[Dict]]:
+    """
+    Load the index and metadata from disk, or return the cached copy if neither file has changed
+    """
+
+    import faiss
+
     if not os.path.exists(INDEX_PATH):
         raise FileNotFoundError("No index found. Please index a repo first.")
-    index = faiss.read_index(INDEX_PATH)
-    with open(METADATA_PATH, "r") as f:
-        metadata = json.load(f)
-    return index, metadata
+
+    key = _cache_key()
+    if _cache.get("key") == key:
+        return _cache["index"], _cache["metadata"]
+
+    for _ in range(LOAD_ATTEMPTS):
+        index = faiss.read_index(INDEX_PATH)
+        with open(METADATA_PATH, "r") as f:
+            metadata = json.load(f)
+
+        # Another worker may be mid-save_index, so only cache a pair that matches and didn't change under us
+        if index.ntotal == len(metadata) and _cache_key() == key:
+            _cache.clear()
+            _cache.update(key=key, index=index, metadata=metadata)
+            return index, metadata
+
+        time.sleep(0.5)
+        key = _cache_key()
+
+    raise RuntimeError("Index and metadata are out of sync. Please re-index the repo.")
+
+
+def prewarm_index() -> int:
+    """
+    Load and cache the current index and metadata at startup, then run one dummy search,
+    so the first query does not pay for deserialisation or faiss initialisation.
+    Returns the number of vectors loaded (0 if there is no index).
+    """
+
+    import numpy as np
+
+    if not index_exists():
+        return 0
+
+    index, _ = load_index()
+    if index.ntotal:
+        index.search(np.zeros((1, index.d), dtype=np.float32), 1)
+    return index.ntotal
 
 
 def get_repo_info() -> Optional[Dict]:
@@ -46,24 +113,102 @@ def get_repo_info() -> Optional[Dict]:
         return json.load(f)
 
 
+def mmr_select(
+    query_vec: "np.ndarray",
+    candidate_vecs: "np.ndarray",
+    filepaths: List[str],
+    k: int,
+    lambda_mult: float = MMR_LAMBDA,
+    max_per_file: int = MAX_CHUNKS_PER_FILE,
+) -> List[int]:
+    """
+    Maximal Marginal Relevance over normalized candidate vectors.
+    Returns positions into candidate_vecs, in selection order.
+    Candidates from a file that already has max_per_file selections are skipped
+    until the uncapped pool runs out, then backfilled in MMR order,
+    so min(k, len(candidates)) positions are always returned.
+    """
+
+    import numpy as np
+
+    n = candidate_vecs.shape[0]
+    if n == 0 or k <= 0:
+        return []
+
+    relevance = candidate_vecs @ query_vec
+    _, file_ids = np.unique(np.asarray(filepaths), return_inverse=True)
+    file_counts = np.zeros(file_ids.max() + 1, dtype=np.int32)
+
+    # Highest similarity of each candidate to anything already selected
+    max_sim = np.zeros(n, dtype=np.float32)
+    is_selected = np.zeros(n, dtype=bool)
+    is_capped = np.zeros(n, dtype=bool)
+    selected = []
+
+    while len(selected) < min(k, n):
+        eligible = ~is_selected & ~is_capped
+        if not eligible.any():
+            eligible = ~is_selected
+
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_sim
+        scores[~eligible] = -np.inf
+        best = int(np.argmax(scores))
+
+        selected.append(best)
+        is_selected[best] = True
+        max_sim = np.maximum(max_sim, candidate_vecs @ candidate_vecs[best])
+
+        file_counts[file_ids[best]] += 1
+        if max_per_file and file_counts[file_ids[best]] >= max_per_file:
+            is_capped[file_ids == file_ids[best]] = True
+
+    return selected
+
+
 def search(
-    index: faiss.Index,
+    index: "faiss.Index",
     metadata: List[Dict],
-    query_embedding: np.ndarray,
+    query_embedding: "np.ndarray",
     top_k: int = 6,
+    mmr_lambda: float = MMR_LAMBDA,
+    candidate_multiplier: int = CANDIDATE_MULTIPLIER,
+    max_per_file: int = MAX_CHUNKS_PER_FILE,
 ) -> List[Dict]:
     """
-    Search FAISS index for most similar  chunks.
-    Returns top_k results with similarity scores.
+    Two-stage search for the most similar and diverse chunks.
+      1. Over-fetch top_k * candidate_multiplier candidates from FAISS
+      2. Re-rank the candidates with MMR and a per-file cap down to top_k
+    candidate_multiplier <= 1 skips re-ranking and returns plain top-k.
+    Returns results with cosine similarity scores.
     """
 
+    import faiss
+    import numpy as np
+
     faiss.normalize_L2(query_embedding)
-    scores, indices = index.search(query_embedding, top_k)
+    num_candidates = min(top_k * max(candidate_multiplier, 1), max(top_k, MAX_CANDIDATES), index.ntotal)
+    scores, indices = index.search(query_embedding, num_candidates)
+
+    hits = [(float(score), int(idx)) for score, idx in zip(scores[0], indices[0]) if idx != -1]
+
+    if candidate_multiplier > 1 and len(hits) > top_k:
+        ids = [idx for _, idx in hits]
+        # Stored vectors are already L2-normalized by build_index
+        candidate_vecs = index.reconstruct_batch(np.asarray(ids, dtype="int64"))
+        order = mmr_select(
+            query_embedding[0],
+            candidate_vecs,
+            [metadata[idx]["filepath"] for idx in ids],
+            k=top_k,
+            lambda_mult=mmr_lambda,
+            max_per_file=max_per_file,
+        )
+        hits = [hits[i] for i in order]
+    else:
+        hits = hits[:top_k]
 
     results = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx == -1:
-            continue
+    for score, idx in hits:
         chunk = metadata[idx]
         results.append({
             "content": chunk["content"],
@@ -83,6 +228,14 @@ def index_exists() -> bool:
 
 
 def get_index_size() -> int:
+    """
+    Number of indexed vectors, read from repo_info.json instead of deserialising the index
+    """
+
     if not index_exists():
         return 0
-    return faiss.read_index(INDEX_PATH).ntotal
+    repo_info = get_repo_info()
+    if repo_info and "num_chunks" in repo_info:
+        return repo_info["num_chunks"]
+    index, _ = load_index()
+    return index.ntotal
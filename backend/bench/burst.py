@@ -0,0 +1,77 @@
+"""
+Burst-load benchmark for the Gemini client layer (app/client.py) against a local fake SDK
+
+Fires --requests concurrent embed calls drawn from --distinct questions at a stand-in
+that allows --quota concurrent calls and injects random quota errors, then reports
+SDK call count and latency percentiles.
+
+Run from backend/:
+    python bench/burst.py
+    python bench/burst.py --base-backoff 15 --max-backoff 60   # production backoff
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_genai  # noqa: E402
+
+fake_genai.install()
+
+import app.client as client  # noqa: E402
+
+
+async def timed_embed(question: str) -> float:
+    start = time.perf_counter()
+    await client.embed_content("models/fake-embedding", question, "RETRIEVAL_QUERY")
+    return time.perf_counter() - start
+
+
+async def run(args):
+    random.seed(args.seed)
+    questions = [f"question {random.randrange(args.distinct)}" for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(timed_embed(q) for q in questions)))
+    elapsed = time.perf_counter() - start
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(f"requests={args.requests} distinct={args.distinct} sdk_calls={fake_genai.calls} "
+          f"quota_errors={fake_genai.quota_errors} final_limit={client.limiter.limit}")
+    print(f"p50={percentile(0.50):.2f}s p99={percentile(0.99):.2f}s "
+          f"max={latencies[-1]:.2f}s total={elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--distinct", type=int, default=40)
+    parser.add_argument("--quota", type=int, default=4, help="concurrent calls the fake SDK allows")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="random quota error probability")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake SDK call")
+    parser.add_argument("--base-backoff", type=float, default=0.2)
+    parser.add_argument("--max-backoff", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fake_genai.QUOTA = args.quota
+    fake_genai.ERROR_RATE = args.error_rate
+    fake_genai.LATENCY = args.latency
+    client.BASE_BACKOFF = args.base_backoff
+    client.MAX_BACKOFF = args.max_backoff
+    client.limiter = client.AdaptiveLimiter()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
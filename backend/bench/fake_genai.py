@@ -0,0 +1,77 @@
+"""
+Local stand-in for google.generativeai used by bench/burst.py
+Calls sleep for LATENCY seconds and raise ResourceExhausted when more than QUOTA
+calls are in flight, or at random with probability ERROR_RATE.
+install() registers it in sys.modules, so it replaces the real SDK whether or not that is installed.
+"""
+
+import random
+import sys
+import threading
+import time
+import types
+
+LATENCY = 0.05
+QUOTA = 4
+ERROR_RATE = 0.02
+
+calls = 0
+quota_errors = 0
+_active = 0
+_lock = threading.Lock()
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+def install():
+    exceptions = types.ModuleType("google.api_core.exceptions")
+    exceptions.ResourceExhausted = ResourceExhausted
+    api_core = types.ModuleType("google.api_core")
+    api_core.exceptions = exceptions
+
+    sys.modules.setdefault("google", types.ModuleType("google"))
+    sys.modules["google.api_core"] = api_core
+    sys.modules["google.api_core.exceptions"] = exceptions
+    sys.modules["google.generativeai"] = sys.modules[__name__]
+
+
+def _call():
+    global calls, quota_errors, _active
+    with _lock:
+        calls += 1
+        _active += 1
+        over_quota = _active > QUOTA
+    try:
+        time.sleep(LATENCY)
+        if over_quota or random.random() < ERROR_RATE:
+            with _lock:
+                quota_errors += 1
+            raise ResourceExhausted("quota exceeded")
+    finally:
+        with _lock:
+            _active -= 1
+
+
+def configure(api_key=None):
+    pass
+
+
+def embed_content(model, content, task_type):
+    _call()
+    return {"embedding": [1.0]}
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class GenerativeModel:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None):
+        _call()
+        return _Response(" answer ")
@@ -0,0 +1,112 @@
+"""
+Offline benchmark of MMR re-ranking (app/retrieval.search) against plain top-k at equal k
+
+Builds a synthetic clustered corpus: each topic spans several files, and each file
+has many near-duplicate chunks. Queries target one topic. For plain top-k
+(candidate_multiplier=1) and MMR it reports context coverage as the number of
+distinct files and of distinct relevant files in the k results, plus search latency.
+Generation latency is not included, since prompt size is the same k chunks either way.
+
+Run from backend/ (needs numpy and faiss-cpu from requirements.txt):
+    python bench/mmr.py
+    python bench/mmr.py --top-k 10 --multiplier 6 --mmr-lambda 0.5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval import build_index, search  # noqa: E402
+
+
+def make_corpus(rng, args):
+    topic_vecs = rng.normal(size=(args.topics, args.dim)).astype(np.float32)
+    vectors, metadata, file_topics = [], [], []
+
+    for t in range(args.topics):
+        for f in range(args.files_per_topic):
+            filepath = f"topic{t}/file{f}.py"
+            file_vec = topic_vecs[t] + args.file_spread * rng.normal(size=args.dim)
+            for c in range(args.chunks_per_file):
+                vectors.append(file_vec + args.chunk_spread * rng.normal(size=args.dim))
+                metadata.append({
+                    "content": f"# {filepath} chunk {c}",
+                    "filepath": filepath,
+                    "language": "python",
+                    "chunk_type": "function",
+                    "symbol_name": f"fn{c}",
+                    "start_line": c * 20 + 1,
+                })
+            file_topics.append(t)
+
+    return np.asarray(vectors, dtype=np.float32), metadata, topic_vecs
+
+
+def run_queries(index, metadata, queries, args, multiplier):
+    files, relevant_files, latencies = [], [], []
+
+    for topic, query in queries:
+        start = time.perf_counter()
+        results = search(
+            index, metadata, query.copy(),
+            top_k=args.top_k,
+            mmr_lambda=args.mmr_lambda,
+            candidate_multiplier=multiplier,
+        )
+        latencies.append(time.perf_counter() - start)
+
+        paths = {r["filepath"] for r in results}
+        files.append(len(paths))
+        relevant_files.append(sum(p.startswith(f"topic{topic}/") for p in paths))
+
+    latencies.sort()
+    return {
+        "files": statistics.mean(files),
+        "relevant_files": statistics.mean(relevant_files),
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p99_ms": 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--files-per-topic", type=int, default=5)
+    parser.add_argument("--chunks-per-file", type=int, default=25)
+    parser.add_argument("--file-spread", type=float, default=0.6)
+    parser.add_argument("--chunk-spread", type=float, default=0.3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--multiplier", type=int, default=4)
+    parser.add_argument("--mmr-lambda", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors, metadata, topic_vecs = make_corpus(rng, args)
+    index = build_index(vectors)
+
+    queries = []
+    for _ in range(args.queries):
+        topic = int(rng.integers(args.topics))
+        query = topic_vecs[topic] + 0.8 * rng.normal(size=args.dim)
+        queries.append((topic, np.asarray([query], dtype=np.float32)))
+
+    print(f"corpus: {index.ntotal} chunks, {args.topics * args.files_per_topic} files, dim {args.dim}; "
+          f"top_k={args.top_k}, {args.queries} queries")
+    search(index, metadata, queries[0][1].copy(), top_k=args.top_k)    # warm up faiss/BLAS
+    for name, multiplier in (("plain top-k", 1), (f"MMR x{args.multiplier}", args.multiplier)):
+        r = run_queries(index, metadata, queries, args, multiplier)
+        print(f"{name:>12}: distinct files {r['files']:.2f}, relevant files {r['relevant_files']:.2f}/"
+              f"{args.files_per_topic}, search p50 {r['p50_ms']:.2f}ms p99 {r['p99_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()